@@ -9,7 +9,8 @@ from jupyter_kernel_client import AsyncGatewayKernelSession, AsyncKernelSessionP
 async def single_session_example():
     """Example of using a single async session."""
     print("=== Single Session Example ===")
-    
+    loop = asyncio.get_running_loop()
+
     # Connection parameters
     gateway_http = "http://localhost:8889"
     gateway_ws = "ws://localhost:8889"
@@ -39,9 +40,9 @@ async def single_session_example():
         
         # Wait for all tasks to complete
         print("Running concurrent code execution...")
-        start_time = asyncio.get_event_loop().time()
+        start_time = loop.time()
         results = await asyncio.gather(*tasks)
-        end_time = asyncio.get_event_loop().time()
+        end_time = loop.time()
         
         print(f"Results: {results}")
         print(f"Concurrent execution time: {end_time - start_time:.3f} seconds")
@@ -53,7 +54,8 @@ async def single_session_example():
 async def pool_example():
     """Example of using a kernel session pool."""
     print("\n=== Session Pool Example ===")
-    
+    loop = asyncio.get_running_loop()
+
     # Connection parameters
     gateway_http = "http://localhost:8889"
     gateway_ws = "ws://localhost:8889"
@@ -91,14 +93,14 @@ async def pool_example():
     
     # Run multiple tasks concurrently
     print("Running multiple tasks using the pool...")
-    start_time = asyncio.get_event_loop().time()
+    start_time = loop.time()
     results = await asyncio.gather(
         run_task(1),
         run_task(2),
         run_task(3),
         run_task(4)
     )
-    end_time = asyncio.get_event_loop().time()
+    end_time = loop.time()
     
     print(f"All tasks completed with results: {results}")
     print(f"Total time with pool (4 tasks): {end_time - start_time:.3f} seconds")
@@ -116,4 +118,14 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    # Bootstrap the loop manually so we can install the eager task factory
+    # (Python 3.12+): coroutines that don't block complete without a
+    # round-trip through the event loop, which speeds up the gather-heavy
+    # examples above.
+    loop = asyncio.new_event_loop()
+    if hasattr(asyncio, "eager_task_factory"):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close() 
\ No newline at end of file
@@ -91,10 +91,12 @@ def run_auth_example():
         else:
             print("File download failed")
         
-        # Delete the test files
+        # Delete the test files in a single batched request
         print("\nCleaning up...")
-        session.execute_file_op('delete', 'test.txt')
-        session.auth_manager.delete_file('uploaded_file.txt')
+        session.auth_manager.batch([
+            {"op": "delete", "filename": "test.txt"},
+            {"op": "delete", "filename": "uploaded_file.txt"},
+        ])
         
         # Remove local temporary files
         if os.path.exists(local_path):
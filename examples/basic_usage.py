@@ -71,7 +71,7 @@ with open('/data/shared/example_output.txt', 'w') as f:
     # Display metric information
     print("\nMetrics:")
     print(f"Executions: {session.metrics['executions']}")
-    print(f"Average execution time: {sum(session.metrics['execute_times']) / len(session.metrics['execute_times']):.3f} seconds")
+    print(f"Average execution time: {session.metrics['execute_time_sum'] / session.metrics['executions']:.3f} seconds")
     print(f"Startup time: {session.metrics['startup_times'][0]:.3f} seconds")
 
 
@@ -3,7 +3,7 @@
 Example demonstrating the usage of Prometheus metrics with the Jupyter Kernel Client.
 """
 import time
-import threading
+from concurrent.futures import ThreadPoolExecutor
 from prometheus_client import start_http_server
 from jupyter_kernel_client import PrometheusGatewayKernelSession, PrometheusKernelSessionPool
 
@@ -53,24 +53,32 @@ def run_session_example():
 
 
 def run_pool_example():
-    """Example of using a kernel session pool with metrics."""
+    """
+    Example of using a kernel session pool with metrics.
+
+    Workers run on a bounded ThreadPoolExecutor rather than one thread per
+    request: thread-per-request falls apart under high concurrency (context
+    switch storms), while a fixed-size executor keeps the thread count
+    bounded and lets back-pressure flow through the pool.
+    """
     print("\n=== Session Pool with Prometheus Metrics ===")
-    
+
     # Connection parameters
     gateway_http = "http://localhost:8889"
     gateway_ws = "ws://localhost:8889"
     # 默认内核为 python3（非自定义 sandbox 内核）
     kernel_name = "python3"
-    
+
     # Create a pool with metrics
+    pool_size = 2
     pool = PrometheusKernelSessionPool(
-        2,
+        pool_size,
         gateway_http=gateway_http,
         gateway_ws=gateway_ws,
         kernel_name=kernel_name
     )
     
-    # Create and start worker threads
+    # Define the worker task
     def worker(worker_id):
         print(f"Worker {worker_id} starting")
         session = pool.acquire()
@@ -83,17 +91,10 @@ def run_pool_example():
             print(f"Worker {worker_id} returning session")
             pool.release(session)
     
-    print("Starting worker threads...")
-    threads = []
-    for i in range(4):
-        thread = threading.Thread(target=worker, args=(i+1,))
-        threads.append(thread)
-        thread.start()
-    
-    # Wait for all threads to complete
-    for thread in threads:
-        thread.join()
-    
+    print("Starting workers on a bounded thread pool...")
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        list(executor.map(worker, range(1, 5)))
+
     print("All workers completed - pool metrics have been recorded")
     
     # Clean up
@@ -1,58 +1,183 @@
-from fastapi import FastAPI, UploadFile, File, Header, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import Depends, FastAPI, UploadFile, File, Header, HTTPException
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from typing import Any, Dict, List
+import asyncio
+import hmac
+import itertools
 import os
-import shutil
+import aiofiles
 
-app = FastAPI()
+# orjson serializes responses several times faster than the stdlib json
+# default, which matters for the /list and /batch endpoints
+app = FastAPI(default_response_class=ORJSONResponse)
 
 SHARED_DIR = "/data/shared"
-# avoid hardcoding the token in the code
-WRITE_TOKEN = os.getenv("WRITE_TOKEN")
+UPLOAD_CHUNK_SIZE = 1 << 20  # stream uploads in 1 MiB chunks
+
+
+def _shared_path(filename: str) -> str:
+    """Join filename onto SHARED_DIR, rejecting paths that escape it."""
+    filepath = os.path.realpath(os.path.join(SHARED_DIR, filename))
+    if not filepath.startswith(os.path.realpath(SHARED_DIR) + os.sep):
+        raise HTTPException(400, "Invalid filename")
+    return filepath
+# avoid hardcoding the token in the code; pre-encode once so each request
+# does a single constant-time bytes comparison
 # WRITE_TOKEN = "s3cr3t-token"  # Only those who have this token can write or delete
+_WRITE_TOKEN_B = (os.getenv("WRITE_TOKEN") or "").encode()
+
+
+def require_write_token(token: str = Header(None)):
+    """Shared auth dependency for the write/delete endpoints."""
+    if not hmac.compare_digest((token or "").encode(), _WRITE_TOKEN_B):
+        raise HTTPException(403, "Not authorized")
 
-# 1. Read-only: list files
+# 1. Read-only: list files (paginated; scan runs off the event loop)
 @app.get("/list")
-async def list_files():
-    return os.listdir(SHARED_DIR)
+async def list_files(limit: int = 1000, prefix: str = ""):
+    def _scan():
+        with os.scandir(SHARED_DIR) as entries:
+            names = (e.name for e in entries)
+            if prefix:
+                names = (name for name in names if name.startswith(prefix))
+            return list(itertools.islice(names, limit))
 
-# 2. Read-only: download a file
+    return await asyncio.to_thread(_scan)
+
+# 2. Read-only: download a file (supports HTTP Range for partial reads)
 @app.get("/read/{filename}")
-async def read_file(filename: str):
+async def read_file(filename: str, range: str = Header(None)):
     filepath = os.path.join(SHARED_DIR, filename)
     if not os.path.exists(filepath):
         raise HTTPException(404, "File not found")
-    return FileResponse(filepath)
+
+    file_size = os.path.getsize(filepath)
+
+    if range is None:
+        # Full download: FileResponse streams straight from disk and lets
+        # the server take the sendfile path when available.
+        return FileResponse(
+            filepath,
+            media_type="application/octet-stream",
+            headers={"Accept-Ranges": "bytes"},
+        )
+
+    # Parse "bytes=start-end" (single range only)
+    try:
+        unit, _, spec = range.partition("=")
+        if unit.strip() != "bytes":
+            raise ValueError
+        start_s, _, end_s = spec.partition("-")
+        if not start_s and not end_s:
+            raise ValueError  # "bytes=-" names no range at all
+        if not start_s:
+            # suffix range: "bytes=-N" means the last N bytes
+            start = max(0, file_size - int(end_s))
+            end = file_size - 1
+        else:
+            start = int(start_s)
+            end = int(end_s) if end_s else file_size - 1
+    except ValueError:
+        raise HTTPException(416, "Invalid Range header")
+
+    if start > end or start >= file_size:
+        raise HTTPException(416, "Requested range not satisfiable")
+    end = min(end, file_size - 1)
+
+    async def stream_range():
+        remaining = end - start + 1
+        async with aiofiles.open(filepath, "rb") as f:
+            await f.seek(start)
+            while remaining > 0:
+                chunk = await f.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    return StreamingResponse(
+        stream_range(),
+        status_code=206,
+        media_type="application/octet-stream",
+        headers={
+            "Content-Range": f"bytes {start}-{end}/{file_size}",
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(end - start + 1),
+        },
+    )
 
 # 3. Secure: upload a new file (only if token is provided)
-@app.post("/upload")
-async def upload_file(file: UploadFile = File(...), token: str = Header(None)):
-    if token != WRITE_TOKEN:
-        raise HTTPException(403, "Not authorized to upload")
-    
-    filepath = os.path.join(SHARED_DIR, file.filename)
-    with open(filepath, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+@app.post("/upload", dependencies=[Depends(require_write_token)])
+async def upload_file(file: UploadFile = File(...)):
+    filepath = _shared_path(file.filename)
+    # Stream chunks asynchronously so a large upload doesn't block the event loop
+    async with aiofiles.open(filepath, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await f.write(chunk)
+    await file.close()
     return {"status": "uploaded", "filename": file.filename}
 
 # 4. Secure: overwrite a file (only if token is provided)
-@app.put("/overwrite/{filename}")
-async def overwrite_file(filename: str, file: UploadFile = File(...), token: str = Header(None)):
-    if token != WRITE_TOKEN:
-        raise HTTPException(403, "Not authorized to overwrite")
-    filepath = os.path.join(SHARED_DIR, filename)
-    with open(filepath, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+@app.put("/overwrite/{filename}", dependencies=[Depends(require_write_token)])
+async def overwrite_file(filename: str, file: UploadFile = File(...)):
+    filepath = _shared_path(filename)
+    async with aiofiles.open(filepath, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await f.write(chunk)
+    await file.close()
     return {"status": "overwritten", "filename": filename}
 
 # 5. Secure: delete a file (only if token is provided)
-@app.delete("/delete/{filename}")
-async def delete_file(filename: str, token: str = Header(None)):
-    if token != WRITE_TOKEN:
-        raise HTTPException(403, "Not authorized to delete")
-
+@app.delete("/delete/{filename}", dependencies=[Depends(require_write_token)])
+async def delete_file(filename: str):
     filepath = os.path.join(SHARED_DIR, filename)
     if not os.path.exists(filepath):
         raise HTTPException(404, "File not found")
     
     os.remove(filepath)
     return {"status": "deleted", "filename": filename}
+
+# Serialize batch mutations so a batch runs as one critical section
+_batch_lock = asyncio.Lock()
+
+# 6. Secure: run several file operations in a single request
+@app.post("/batch", dependencies=[Depends(require_write_token)])
+async def batch_file_ops(ops: List[Dict[str, Any]]):
+    results = []
+    async with _batch_lock:
+        for op in ops:
+            action = op.get("op")
+            filename = op.get("filename", "")
+            try:
+                filepath = _shared_path(filename)
+                if action == "write":
+                    async with aiofiles.open(filepath, "w") as f:
+                        await f.write(op.get("content", ""))
+                    results.append({"status": "written", "filename": filename})
+                elif action == "append":
+                    async with aiofiles.open(filepath, "a") as f:
+                        await f.write(op.get("content", ""))
+                    results.append({"status": "appended", "filename": filename})
+                elif action == "read":
+                    if not os.path.exists(filepath):
+                        results.append({"status": "error", "filename": filename,
+                                        "detail": "File not found"})
+                        continue
+                    async with aiofiles.open(filepath, "r") as f:
+                        content = await f.read()
+                    results.append({"status": "read", "filename": filename,
+                                    "content": content})
+                elif action == "delete":
+                    if not os.path.exists(filepath):
+                        results.append({"status": "error", "filename": filename,
+                                        "detail": "File not found"})
+                        continue
+                    os.remove(filepath)
+                    results.append({"status": "deleted", "filename": filename})
+                else:
+                    results.append({"status": "error", "filename": filename,
+                                    "detail": f"Unknown operation: {action}"})
+            except HTTPException as e:
+                results.append({"status": "error", "filename": filename,
+                                "detail": e.detail})
+    return results
@@ -13,12 +13,15 @@ setup(
         "websocket-client>=1.6.1",
     ],
     extras_require={
-        "async": ["aiohttp>=3.8.5", "websockets>=11.0.3"],
+        "async": ["aiohttp>=3.8.5", "websockets>=11.0.3", "uvloop>=0.19"],
         "metrics": ["prometheus-client>=0.17.1"],
+        "files": ["requests-toolbelt>=1.0.0"],
         "all": [
-            "aiohttp>=3.8.5", 
-            "websockets>=11.0.3", 
-            "prometheus-client>=0.17.1"
+            "aiohttp>=3.8.5",
+            "websockets>=11.0.3",
+            "uvloop>=0.19",
+            "prometheus-client>=0.17.1",
+            "requests-toolbelt>=1.0.0"
         ],
         "dev": [
             "pytest>=7.4.0",
@@ -18,36 +18,40 @@ Basic usage:
 
 __version__ = "0.1.0"
 
+import importlib
+
 # Core client
 from jupyter_kernel_client.core.client import GatewayKernelSession, KernelSessionPool
 
-# Convenience imports for optional components
-try:
-    from jupyter_kernel_client.async_client.client import AsyncGatewayKernelSession, AsyncKernelSessionPool
-except ImportError:
-    # async dependencies not installed
-    pass
-
-try:
-    from jupyter_kernel_client.metrics.prometheus import (
-        PrometheusGatewayKernelSession,
-        PrometheusKernelSessionPool
-    )
-except ImportError:
-    # prometheus dependencies not installed
-    pass
-
-try:
-    from jupyter_kernel_client.auth.auth_client import (
-        AuthenticatedKernelSession,
-        KernelAuthManager
-    )
-except ImportError:
-    # auth dependencies not installed
-    pass
+# Optional components are imported lazily (PEP 562) so that synchronous-only
+# users don't pay the import cost of aiohttp/websockets/prometheus_client.
+_LAZY_IMPORTS = {
+    "AsyncGatewayKernelSession": "jupyter_kernel_client.async_client.client",
+    "AsyncKernelSessionPool": "jupyter_kernel_client.async_client.client",
+    "PrometheusGatewayKernelSession": "jupyter_kernel_client.metrics.prometheus",
+    "PrometheusKernelSessionPool": "jupyter_kernel_client.metrics.prometheus",
+    "AuthenticatedKernelSession": "jupyter_kernel_client.auth.auth_client",
+    "KernelAuthManager": "jupyter_kernel_client.auth.auth_client",
+}
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # cache so subsequent lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 # Convenient exports
 __all__ = [
     "GatewayKernelSession",
     "KernelSessionPool",
+    *_LAZY_IMPORTS,
 ] 
\ No newline at end of file
@@ -4,13 +4,68 @@ Asynchronous client module for interacting with Jupyter Enterprise Gateway kerne
 import uuid
 import json
 import asyncio
+import copy
+import socket
 import time
 import logging
+from collections import deque
 from typing import Optional, Dict, List, Any
 
 import aiohttp
 import websockets
 
+logger = logging.getLogger(__name__)
+
+try:
+    # orjson parses/serializes typical Jupyter messages several times
+    # faster than stdlib json, which matters on stream-heavy executions
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+
+def _scan_parent_msg_id(raw):
+    """
+    Cheaply pull parent_header.msg_id out of a raw frame without a full
+    JSON decode, so the listener can drop unaddressed traffic early.
+    Returns None when no id can be found; callers must re-check against
+    the properly decoded message before trusting a match.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode()
+    pos = raw.find(b'"parent_header"')
+    if pos == -1:
+        return None
+    pos = raw.find(b'"msg_id"', pos)
+    if pos == -1:
+        return None
+    start = raw.find(b'"', raw.find(b':', pos) + 1)
+    if start == -1:
+        return None
+    end = raw.find(b'"', start + 1)
+    if end == -1:
+        return None
+    return raw[start + 1:end].decode()
+
+
+try:
+    # uvloop's libuv-based loop substantially reduces per-callback and
+    # socket I/O overhead for the WS+HTTP traffic this client generates.
+    import uvloop
+    uvloop.install()
+except ImportError:
+    # optional; the stock asyncio loop works fine
+    pass
+
 
 class AsyncGatewayKernelSession:
     """
@@ -23,7 +78,25 @@ class AsyncGatewayKernelSession:
       - Basic in-memory metrics
       - Clean teardown
       - Optional token-based auth
+      - Optional shared aiohttp.ClientSession (pools pass one in so all
+        members reuse a single keep-alive connection pool)
     """
+
+    # Immutable execute_request skeleton; each session deep-copies it once
+    # and mutates only msg_id and code per call
+    _PAYLOAD_SKEL = {
+        'header': {
+            'msg_id': None,
+            'session': None,
+            'msg_type': 'execute_request',
+            'version': '5.0',
+        },
+        'parent_header': {},
+        'metadata': {},
+        'channel': 'shell',
+        'content': {'code': None, 'silent': False},
+    }
+
     def __init__(
         self,
         gateway_http: str,
@@ -34,6 +107,8 @@ class AsyncGatewayKernelSession:
         max_retries: int = 3,
         retry_delay: float = 1.0,
         auth_token: Optional[str] = None,
+        http_session: Optional[aiohttp.ClientSession] = None,
+        compression: Optional[str] = None,
     ):
         self.gateway_http = gateway_http.rstrip('/')
         self.gateway_ws = gateway_ws.rstrip('/')
@@ -43,24 +118,45 @@ class AsyncGatewayKernelSession:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.auth_token = auth_token
+        # auth headers are identical for every request in this session, so
+        # build the dict once instead of per call
+        self._auth_headers = (
+            {"Authorization": f"Token {auth_token}"} if auth_token else {}
+        )
+        # Jupyter traffic is mostly small JSON frames, for which the zlib
+        # setup of permessage-deflate costs more CPU than the bytes it
+        # saves; pass compression='deflate' to opt back in for large
+        # result payloads.
+        self.compression = compression
 
         self.kernel_id: Optional[str] = None
         self.session_id = uuid.uuid4().hex
         self.ws = None
 
-        # Metrics
+        # per-session payload template, serialized to bytes before each
+        # await so concurrent executes can't clobber each other
+        self._payload_skel = copy.deepcopy(self._PAYLOAD_SKEL)
+        self._payload_skel['header']['session'] = self.session_id
+
+        # metrics: bounded ring buffers so a long-lived pool session keeps
+        # constant memory no matter how many executes it serves
         self.metrics = {
-            'startup_times': [],
-            'execute_times': [],
+            'startup_times': deque(maxlen=1024),
+            'execute_times': deque(maxlen=1024),
             'executions': 0,
         }
 
-        # Async message handling
-        self._msg_queue = asyncio.Queue()
+        # Async message handling: the listener demuxes replies by parent
+        # msg_id into per-execute deques, waking that execute's Future, so
+        # concurrent executes never scan each other's traffic
+        self._pending: Dict[str, deque] = {}
+        self._waiters: Dict[str, asyncio.Future] = {}
         self._listener_task = None
         self._running = False
-        logging.basicConfig(level=logging.INFO)
-        self._http_session = None
+        # A shared session (e.g. from a pool) is reused for keepalive;
+        # otherwise we create and own one per kernel session.
+        self._http_session = http_session
+        self._owns_http_session = http_session is None
 
     async def __aenter__(self):
         await self._start_kernel_with_retries()
@@ -73,33 +169,30 @@ class AsyncGatewayKernelSession:
 
     async def _start_kernel_with_retries(self):
         """Start a kernel with retry logic."""
-        self._http_session = aiohttp.ClientSession()
+        if self._http_session is None:
+            self._http_session = aiohttp.ClientSession()
         for attempt in range(1, self.max_retries + 1):
-            start = time.time()
+            start = time.perf_counter()
             try:
                 payload = {"name": self.kname}
                 if self.launch_env:
                     payload['env'] = self.launch_env
 
-                headers = {}
-                if self.auth_token:
-                    headers["Authorization"] = f"Token {self.auth_token}"
-
                 async with self._http_session.post(
                     f"{self.gateway_http}/api/kernels",
                     json=payload,
-                    headers=headers,
+                    headers=self._auth_headers,
                     timeout=self.startup_timeout,
                 ) as resp:
                     resp.raise_for_status()
                     response_data = await resp.json()
                     self.kernel_id = response_data['id']
-                    duration = time.time() - start
+                    duration = time.perf_counter() - start
                     self.metrics['startup_times'].append(duration)
-                    logging.info(f"Kernel started in {duration:.2f}s (attempt {attempt})")
+                    logger.info("Kernel started in %.2fs (attempt %d)", duration, attempt)
                     return
             except Exception as e:
-                logging.warning(f"Startup attempt {attempt} failed: {e}")
+                logger.warning("Startup attempt %d failed: %s", attempt, e)
                 if attempt < self.max_retries:
                     await asyncio.sleep(self.retry_delay)
                 else:
@@ -112,30 +205,58 @@ class AsyncGatewayKernelSession:
             f"?session_id={self.session_id}"
         )
         
-        headers = {}
-        if self.auth_token:
-            headers["Authorization"] = f"Token {self.auth_token}"
-            
-        self.ws = await websockets.connect(url, extra_headers=headers)
-        logging.info(f"WebSocket connected to {url}")
+        # max_size=None avoids re-buffering large IOPub frames
+        self.ws = await websockets.connect(
+            url, extra_headers=self._auth_headers, max_size=None,
+            compression=self.compression,
+        )
+        # Kernel messages are many small frames; disable Nagle so they go
+        # out immediately instead of waiting on delayed ACKs
+        sock = self.ws.transport.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        logger.info("WebSocket connected to %s", url)
 
     def _start_listener(self):
         """Start the async WebSocket listener."""
         self._running = True
         self._listener_task = asyncio.create_task(self._listen())
 
+    def _route_frame(self, message):
+        """Demux one raw frame to the pending execute it belongs to."""
+        # Most IOPub traffic (status, execute_input, other parents) isn't
+        # for any pending execute; skip the full decode for those frames
+        if _scan_parent_msg_id(message) not in self._pending:
+            return
+        msg = _loads(message)
+        parent_id = msg.get('parent_header', {}).get('msg_id')
+        msgs = self._pending.get(parent_id)
+        if msgs is None:
+            return  # no execute waiting on this msg_id
+        msgs.append(msg)
+        waiter = self._waiters.get(parent_id)
+        if waiter and not waiter.done():
+            waiter.set_result(None)
+
     async def _listen(self):
         """Listen for WebSocket messages in a separate task."""
         while self._running:
             try:
                 message = await self.ws.recv()
-                msg = json.loads(message)
-                await self._msg_queue.put(msg)
-            except (websockets.exceptions.ConnectionClosed, 
+                self._route_frame(message)
+                # The protocol often has more frames already buffered
+                # (IOPub bursts arrive faster than we wake up); drain them
+                # synchronously so one event-loop wakeup delivers the whole
+                # batch instead of one recv() round-trip per frame.
+                buffered = getattr(self.ws, 'messages', None)
+                if buffered:
+                    while buffered:
+                        self._route_frame(buffered.popleft())
+            except (websockets.exceptions.ConnectionClosed,
                     websockets.exceptions.ConnectionClosedError):
                 break
             except Exception as e:
-                logging.error(f"Listener error: {e}")
+                logger.error("Listener error: %s", e)
                 break
 
     async def execute(self, code: str, timeout: float = 10.0) -> str:
@@ -143,74 +264,137 @@ class AsyncGatewayKernelSession:
         if not self.ws:
             raise RuntimeError("WebSocket not open")
             
-        start = time.time()
+        start = time.perf_counter()
         self.metrics['executions'] += 1
         msg_id = uuid.uuid4().hex
-        
-        header = {
-            'msg_id': msg_id,
-            'session': self.session_id,
-            'msg_type': 'execute_request',
-            'version': '5.0',
-        }
-        
-        payload = {
-            'header': header,
-            'parent_header': {},
-            'metadata': {},
-            'channel': 'shell',
-            'content': {'code': code, 'silent': False},
-        }
-        
-        # Send with retry
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                await self.ws.send(json.dumps(payload))
-                break
-            except websockets.exceptions.WebSocketException as e:
-                logging.warning(f"Send attempt {attempt} failed: {e}")
-                if attempt < self.max_retries:
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    raise RuntimeError(f"Failed to send message after {self.max_retries} attempts")
+        self._payload_skel['header']['msg_id'] = msg_id
+        self._payload_skel['content']['code'] = code
+        # decode to str: websockets sends bytes as BINARY frames, which the
+        # gateway's channels handler treats as a multi-buffer wire format
+        # and drops; Jupyter messages must go out as TEXT frames
+        frame = _dumps(self._payload_skel).decode()
 
-        # Wait for responses
-        output = []
-        future_time = time.time() + timeout
-        
-        while time.time() < future_time:
-            try:
-                # Create a timeout for queue.get
-                msg = await asyncio.wait_for(
-                    self._msg_queue.get(), 
-                    timeout=max(0.1, future_time - time.time())
-                )
-            except asyncio.TimeoutError:
-                # No message received in time
-                continue
-                
-            # Check if this is the response to our execute request
-            if msg.get('parent_header', {}).get('msg_id') != msg_id:
-                continue
-                
-            msg_type = msg['header']['msg_type']
-            
-            if msg_type == 'stream':
-                output.append(msg['content']['text'])
-            elif msg_type == 'execute_result':
-                data = msg['content']['data']
-                output.append(data.get('text/plain', ''))
-                break
-            elif msg_type == 'error':
-                tb = '\n'.join(msg['content']['traceback'])
-                raise RuntimeError(f"Kernel error:\n{tb}")
-                
-        duration = time.time() - start
+
+        # Register the response queue before sending so the listener can
+        # route replies straight to this execute
+        msgs: deque = deque()
+        self._pending[msg_id] = msgs
+        try:
+            # Send with retry
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    await self.ws.send(frame)
+                    break
+                except websockets.exceptions.WebSocketException as e:
+                    logger.warning("Send attempt %d failed: %s", attempt, e)
+                    if attempt < self.max_retries:
+                        await asyncio.sleep(self.retry_delay)
+                    else:
+                        raise RuntimeError(f"Failed to send message after {self.max_retries} attempts")
+
+            result = await self._await_result(msg_id, timeout)
+        finally:
+            self._pending.pop(msg_id, None)
+            self._waiters.pop(msg_id, None)
+
+        duration = time.perf_counter() - start
         self.metrics['execute_times'].append(duration)
-        logging.info(f"Execution took {duration:.2f}s")
-        
+        # hot path: skip handler machinery entirely when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Execution took %.2fs", duration)
+
+        return result
+
+    async def _await_result(self, msg_id: str, timeout: float) -> str:
+        """Collect the output routed to msg_id until a result or error."""
+        msgs = self._pending[msg_id]
+        output = []
+        loop = asyncio.get_running_loop()
+        timed_out = False
+
+        def _expire():
+            # Wake whichever waiter is current; the loop below sees
+            # timed_out and stops instead of parking again
+            nonlocal timed_out
+            timed_out = True
+            waiter = self._waiters.get(msg_id)
+            if waiter and not waiter.done():
+                waiter.set_result(None)
+
+        # One TimerHandle for the whole call: asyncio.wait_for would
+        # schedule (and tear down) a fresh timer per wakeup, which on a
+        # stream-heavy execute means one per IOPub chunk
+        timer = loop.call_later(timeout, _expire)
+        try:
+            while True:
+                if not msgs:
+                    if timed_out:
+                        break
+                    # Park on a fresh future until the listener routes to us
+                    waiter = loop.create_future()
+                    self._waiters[msg_id] = waiter
+                    try:
+                        await waiter
+                    finally:
+                        self._waiters.pop(msg_id, None)
+                    if not msgs:
+                        if timed_out:
+                            break
+                        continue
+                msg = msgs.popleft()
+
+                msg_type = msg['header']['msg_type']
+
+                if msg_type == 'stream':
+                    output.append(msg['content']['text'])
+                elif msg_type == 'execute_result':
+                    data = msg['content']['data']
+                    output.append(data.get('text/plain', ''))
+                    break
+                elif msg_type == 'error':
+                    tb = '\n'.join(msg['content']['traceback'])
+                    raise RuntimeError(f"Kernel error:\n{tb}")
+        finally:
+            timer.cancel()
+
         return ''.join(output)
 
+    async def batch_execute(self, codes: List[str], timeout: float = 10.0) -> List[str]:
+        """
+        Execute several code snippets in one burst.
+
+        All execute_requests are sent via one asyncio.gather so the
+        WebSocket writer can coalesce the frames into a single flush,
+        then the results are awaited concurrently.
+        """
+        if not self.ws:
+            raise RuntimeError("WebSocket not open")
+
+        self.metrics['executions'] += len(codes)
+        msg_ids = []
+        frames = []
+        for code in codes:
+            msg_id = uuid.uuid4().hex
+            self._payload_skel['header']['msg_id'] = msg_id
+            self._payload_skel['content']['code'] = code
+            # TEXT frames, as in execute(): binary frames are dropped by
+            # the gateway's channels handler
+            frames.append(_dumps(self._payload_skel).decode())
+            self._pending[msg_id] = deque()
+            msg_ids.append(msg_id)
+
+        try:
+            await asyncio.gather(
+                *(self.ws.send(frame) for frame in frames)
+            )
+            return list(await asyncio.gather(
+                *(self._await_result(mid, timeout) for mid in msg_ids)
+            ))
+        finally:
+            for mid in msg_ids:
+                self._pending.pop(mid, None)
+                self._waiters.pop(mid, None)
+
     async def shutdown(self):
         """Clean up resources."""
         self._running = False
@@ -233,20 +417,17 @@ class AsyncGatewayKernelSession:
         # Delete kernel
         if self.kernel_id and self._http_session:
             try:
-                headers = {}
-                if self.auth_token:
-                    headers["Authorization"] = f"Token {self.auth_token}"
-                    
                 async with self._http_session.delete(
                     f"{self.gateway_http}/api/kernels/{self.kernel_id}",
-                    headers=headers
+                    headers=self._auth_headers
                 ) as resp:
                     pass
             except:
                 pass
                 
-        # Close HTTP session
-        if self._http_session:
+        # Close HTTP session (only if we created it; shared sessions are
+        # closed by their owner, e.g. the pool)
+        if self._http_session and self._owns_http_session:
             await self._http_session.close()
 
 
@@ -255,49 +436,120 @@ class AsyncKernelSessionPool:
     A basic pool managing a fixed number of persistent asynchronous kernel sessions.
     """
     def __init__(self, size: int, **session_kwargs):
-        self._pool: List[AsyncGatewayKernelSession] = []
+        # Bounded FIFO of free sessions: a single future wakeup per
+        # acquire/release handoff and natural backpressure when all
+        # kernels are busy.
+        self._free: asyncio.Queue[AsyncGatewayKernelSession] = asyncio.Queue(
+            maxsize=size
+        )
+        self._sessions: List[AsyncGatewayKernelSession] = []
         self._lock = asyncio.Lock()
         self._size = size
         self._session_kwargs = session_kwargs
         self._initialized = False
-        
+        self._init_future: Optional[asyncio.Future] = None
+        self._http: Optional[aiohttp.ClientSession] = None
+
+    def _create_session(self) -> AsyncGatewayKernelSession:
+        """Build a session that shares the pool's HTTP connection pool."""
+        return AsyncGatewayKernelSession(
+            http_session=self._http, **self._session_kwargs
+        )
+
     async def initialize(self):
         """Initialize the pool with kernel sessions."""
         if self._initialized:
             return
-            
+
+        # Eager task factory (Python 3.12+) lets already-ready awaitables
+        # complete without an event loop round-trip, which benefits the
+        # short acquire/release/execute tasks this pool is used for.
+        if hasattr(asyncio, "eager_task_factory"):
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
+        # Elect one initializer under the lock, then run the slow kernel
+        # startups with the lock released: holding it across seconds of
+        # HTTP + websocket handshakes would park every concurrent
+        # acquirer behind the warm-up. Followers await the leader's
+        # future instead.
         async with self._lock:
-            for _ in range(self._size):
-                sess = AsyncGatewayKernelSession(**self._session_kwargs)
+            if self._initialized:
+                return
+            follower = self._init_future
+            if follower is None:
+                self._init_future = asyncio.get_running_loop().create_future()
+        if follower is not None:
+            await follower
+            return
+
+        try:
+            # One HTTP session for the whole pool: keepalive connections are
+            # reused across every kernel start/shutdown instead of paying a
+            # TCP handshake per member.
+            if self._http is None:
+                self._http = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=0, keepalive_timeout=75)
+                )
+            # Start all kernels concurrently: warm-up takes ~max(t_startup)
+            # instead of size * t_startup.
+            async def _start_one() -> AsyncGatewayKernelSession:
+                sess = self._create_session()
                 await sess.__aenter__()
-                self._pool.append(sess)
+                return sess
+
+            results = await asyncio.gather(
+                *(_start_one() for _ in range(self._size)),
+                return_exceptions=True,
+            )
+            started = [
+                r for r in results
+                if isinstance(r, AsyncGatewayKernelSession)
+            ]
+            failures = [r for r in results if isinstance(r, BaseException)]
+            if failures:
+                # shut down whatever did come up so a partial warm-up
+                # doesn't leak live kernels and websockets on the gateway
+                if started:
+                    await asyncio.gather(
+                        *(sess.shutdown() for sess in started),
+                        return_exceptions=True,
+                    )
+                raise failures[0]
+            self._sessions = started
+            for sess in self._sessions:
+                self._free.put_nowait(sess)
             self._initialized = True
-            
+            self._init_future.set_result(None)
+        except BaseException as e:
+            fut, self._init_future = self._init_future, None
+            fut.set_exception(e)
+            fut.exception()  # retrieved: followers re-raise via their await
+            raise
+
     async def acquire(self) -> AsyncGatewayKernelSession:
-        """Get a session from the pool."""
+        """Get a session from the pool, waiting if all sessions are busy."""
         if not self._initialized:
             await self.initialize()
-            
-        async with self._lock:
-            if not self._pool:
-                # Create a new session if pool is empty
-                sess = AsyncGatewayKernelSession(**self._session_kwargs)
-                await sess.__aenter__()
-                return sess
-            return self._pool.pop()
-            
+
+        return await self._free.get()
+
     async def release(self, sess: AsyncGatewayKernelSession):
         """Return a session to the pool."""
-        async with self._lock:
-            self._pool.append(sess)
-            
+        self._free.put_nowait(sess)
+
     async def shutdown_all(self):
         """Clean up all sessions in the pool."""
         async with self._lock:
-            for sess in self._pool:
-                await sess.shutdown()
-            self._pool.clear()
+            while not self._free.empty():
+                self._free.get_nowait()
+            if self._sessions:
+                await asyncio.gather(*(sess.shutdown() for sess in self._sessions))
+            self._sessions.clear()
+            if self._http:
+                await self._http.close()
+                self._http = None
             self._initialized = False
+            self._init_future = None
 
 
 # Example usage
@@ -0,0 +1,21 @@
+"""
+Runtime helpers for the asynchronous client.
+"""
+import asyncio
+
+
+def use_uvloop():
+    """
+    Install uvloop as the asyncio event loop policy.
+
+    uvloop reimplements the event loop over libuv and roughly halves the
+    loop overhead of the client's WebSocket+HTTP traffic on Linux. The
+    client module already calls uvloop.install() opportunistically on
+    import; this helper is for applications that configure their loop
+    policy explicitly.
+
+    Raises ImportError if uvloop is not installed (pip install
+    jupyter-kernel-client[async]).
+    """
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
@@ -0,0 +1,122 @@
+from unittest.mock import MagicMock
+import asyncio
+import json
+import pytest
+
+# the async client hard-depends on the async extra; skip the module
+# cleanly instead of erroring at collection when it isn't installed
+pytest.importorskip("aiohttp")
+pytest.importorskip("websockets")
+
+from jupyter_kernel_client.async_client.client import AsyncGatewayKernelSession
+
+GATEWAY_HTTP = "http://localhost:8889"
+GATEWAY_WS = "ws://localhost:8889"
+KERNEL_NAME = "python3"
+
+
+def _result_msg(msg_id, text):
+    return {
+        "header": {"msg_type": "execute_result"},
+        "parent_header": {"msg_id": msg_id},
+        "content": {"data": {"text/plain": text}},
+    }
+
+
+class TestAsyncGatewayKernelSessionMock:
+    """Unit tests for AsyncGatewayKernelSession using mocks."""
+
+    def _session_with_fake_ws(self, sent):
+        """Session whose websocket echoes a result for every send."""
+        session = AsyncGatewayKernelSession(GATEWAY_HTTP, GATEWAY_WS, KERNEL_NAME)
+
+        async def fake_send(frame):
+            sent.append(frame)
+            msg_id = json.loads(frame)['header']['msg_id']
+            session._pending[msg_id].append(_result_msg(msg_id, "4"))
+
+        session.ws = MagicMock()
+        session.ws.send = fake_send
+        return session
+
+    def test_execute_sends_text_frames(self):
+        """execute must send TEXT (str) frames: the gateway's channels
+        handler treats BINARY frames as a multi-buffer format and drops
+        plain JSON sent as bytes."""
+        async def scenario():
+            sent = []
+            session = self._session_with_fake_ws(sent)
+            result = await session.execute("2 + 2", timeout=1)
+            assert result == "4"
+            assert sent
+            assert all(isinstance(frame, str) for frame in sent)
+        asyncio.run(scenario())
+
+    def test_batch_execute_sends_text_frames(self):
+        """batch_execute must send TEXT frames too."""
+        async def scenario():
+            sent = []
+            session = self._session_with_fake_ws(sent)
+            results = await session.batch_execute(["2 + 2", "3 + 3"], timeout=1)
+            assert results == ["4", "4"]
+            assert len(sent) == 2
+            assert all(isinstance(frame, str) for frame in sent)
+        asyncio.run(scenario())
+
+
+# probe result shared by every integration test (same pattern as the sync
+# integration tests); module-level fixtures because pytest deprecates
+# scoped fixtures defined as instance methods
+_GATEWAY_PROBE = {}
+
+
+@pytest.fixture(scope="module")
+def gateway_config():
+    """Fixture for gateway connection details."""
+    return {
+        "http": GATEWAY_HTTP,
+        "ws": GATEWAY_WS,
+        "kernel_name": KERNEL_NAME
+    }
+
+
+@pytest.fixture(scope="class")
+def check_gateway_available(gateway_config):
+    """Skip tests if gateway is not available (probed once per run)."""
+    import requests
+    url = gateway_config['http']
+    available = _GATEWAY_PROBE.get(url)
+    if available is None:
+        try:
+            requests.get(f"{url}/api", timeout=2)
+            available = True
+        except requests.exceptions.RequestException:
+            available = False
+        _GATEWAY_PROBE[url] = available
+    if not available:
+        pytest.skip("Enterprise Gateway not available")
+
+
+@pytest.mark.integration
+class TestAsyncGatewayKernelSessionIntegration:
+    """Integration tests that connect to a real Enterprise Gateway."""
+
+    def test_execute_round_trip(self, gateway_config, check_gateway_available):
+        """Execute code end-to-end over the real websocket channel."""
+        async def scenario():
+            async with AsyncGatewayKernelSession(
+                gateway_config["http"],
+                gateway_config["ws"],
+                gateway_config["kernel_name"]
+            ) as session:
+                result = await session.execute("2 + 2")
+                assert "4" in result
+                results = await session.batch_execute(["1 + 1", "5 * 5"])
+                assert "2" in results[0]
+                assert "25" in results[1]
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    # Run unit tests
+    pytest.main([__file__, '-m', 'not integration'])
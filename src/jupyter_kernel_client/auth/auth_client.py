@@ -3,11 +3,28 @@ Authentication module for interacting with the FastAPI-based file server.
 """
 import os
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any
 from urllib.parse import urljoin
 
 from jupyter_kernel_client.core.client import GatewayKernelSession
 
+# Module-level session so file-server calls reuse keep-alive connections
+_HTTP = requests.Session()
+_HTTP.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=64))
+_HTTP.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=64))
+
+# 1 MiB transfer chunks: large enough to amortize syscalls, small enough
+# to keep memory flat for arbitrarily large artifacts
+_CHUNK_SIZE = 1 << 20
+
+try:
+    # optional: streams multipart uploads instead of materializing the
+    # whole body in memory the way requests' files= does
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
 
 class KernelAuthManager:
     """
@@ -26,22 +43,27 @@ class KernelAuthManager:
     ):
         self.file_server_url = file_server_url.rstrip('/')
         self._auth_token = auth_token or os.environ.get("WRITE_TOKEN")
-        
+        # headers dict built once per token change, not per request
+        self._headers = {"token": self._auth_token} if self._auth_token else {}
+
     @property
     def auth_token(self) -> Optional[str]:
         """Get the current authentication token."""
         return self._auth_token
-        
+
     def set_token(self, token: str):
         """Manually set the authentication token."""
         self._auth_token = token
-        
+        self._headers = {"token": token} if token else {}
+
+    @property
+    def auth_headers(self) -> Dict[str, str]:
+        """Headers with the authentication token (cached)."""
+        return self._headers
+
     def get_auth_headers(self) -> Dict[str, str]:
         """Get headers with authentication token."""
-        headers = {}
-        if self._auth_token:
-            headers["token"] = self._auth_token
-        return headers
+        return self._headers
         
     def validate_token(self) -> bool:
         """
@@ -53,7 +75,7 @@ class KernelAuthManager:
             
         try:
             # Try to list files - this will fail if token is invalid
-            response = requests.get(
+            response = _HTTP.get(
                 urljoin(self.file_server_url, "/list"),
                 headers=self.get_auth_headers()
             )
@@ -93,15 +115,28 @@ class KernelAuthManager:
             
         try:
             filename = filename or os.path.basename(filepath)
-            
+
             with open(filepath, 'rb') as f:
-                files = {'file': (filename, f)}
-                response = requests.post(
-                    urljoin(self.file_server_url, "/upload"),
-                    headers=self.get_auth_headers(),
-                    files=files
-                )
-                
+                if MultipartEncoder is not None:
+                    # streamed multipart: constant memory for large files
+                    encoder = MultipartEncoder(
+                        fields={'file': (filename, f, 'application/octet-stream')}
+                    )
+                    headers = dict(self.get_auth_headers())
+                    headers['Content-Type'] = encoder.content_type
+                    response = _HTTP.post(
+                        urljoin(self.file_server_url, "/upload"),
+                        headers=headers,
+                        data=encoder
+                    )
+                else:
+                    files = {'file': (filename, f)}
+                    response = _HTTP.post(
+                        urljoin(self.file_server_url, "/upload"),
+                        headers=self.get_auth_headers(),
+                        files=files
+                    )
+
             return response.status_code == 200
         except Exception as e:
             print(f"Error uploading file: {e}")
@@ -119,19 +154,22 @@ class KernelAuthManager:
             Path to the downloaded file or None if failed
         """
         try:
-            response = requests.get(
+            # stream=True + chunked writes: the file never lives fully in
+            # memory, and network reads overlap the disk writes
+            with _HTTP.get(
                 urljoin(self.file_server_url, f"/read/{remote_filename}"),
                 # No token needed for read operations
-            )
-            
-            if response.status_code != 200:
-                return None
-                
-            local_path = local_path or os.path.join(os.getcwd(), remote_filename)
-            
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
-                
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    return None
+
+                local_path = local_path or os.path.join(os.getcwd(), remote_filename)
+
+                with open(local_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                        f.write(chunk)
+
             return local_path
         except Exception as e:
             print(f"Error downloading file: {e}")
@@ -151,7 +189,7 @@ class KernelAuthManager:
             raise ValueError("No authentication token available")
             
         try:
-            response = requests.delete(
+            response = _HTTP.delete(
                 urljoin(self.file_server_url, f"/delete/{filename}"),
                 headers=self.get_auth_headers()
             )
@@ -161,6 +199,36 @@ class KernelAuthManager:
             print(f"Error deleting file: {e}")
             return False
 
+    def batch(self, ops: list) -> Optional[list]:
+        """
+        Execute several file operations in a single request.
+
+        Args:
+            ops: List of operation dicts, e.g.
+                [{"op": "write", "filename": "a.txt", "content": "..."},
+                 {"op": "delete", "filename": "b.txt"}]
+
+        Returns:
+            List of per-operation result dicts, or None if the request failed
+        """
+        if not self._auth_token:
+            raise ValueError("No authentication token available")
+
+        try:
+            response = _HTTP.post(
+                urljoin(self.file_server_url, "/batch"),
+                headers=self.get_auth_headers(),
+                json=ops
+            )
+
+            if response.status_code != 200:
+                return None
+
+            return response.json()
+        except Exception as e:
+            print(f"Error executing batch: {e}")
+            return None
+
 
 class AuthenticatedKernelSession(GatewayKernelSession):
     """
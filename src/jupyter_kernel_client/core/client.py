@@ -3,15 +3,106 @@ Core client module for interacting with Jupyter Enterprise Gateway kernels.
 """
 import uuid
 import json
+import asyncio
+import copy
+import hashlib
+import socket
 import threading
-import queue
 import time
 import logging
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict
 
 import requests
+from requests.adapters import HTTPAdapter
 from websocket import create_connection, WebSocketException
 
+logger = logging.getLogger(__name__)
+
+# Module-level session so kernel REST calls (start, shutdown, retries)
+# reuse keep-alive connections instead of re-doing TCP/TLS setup
+_HTTP = requests.Session()
+_HTTP.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=64))
+_HTTP.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=64))
+
+try:
+    # orjson parses/serializes typical Jupyter messages several times
+    # faster than stdlib json, which matters on stream-heavy executions.
+    # _dumps returns UTF-8 bytes so frames go out without a str round trip.
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+
+def _scan_parent_msg_id(raw):
+    """
+    Cheaply pull parent_header.msg_id out of a raw frame without a full
+    JSON decode, so the listener can drop unaddressed traffic early.
+    Returns None when no id can be found; callers must re-check against
+    the properly decoded message before trusting a match.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode()
+    pos = raw.find(b'"parent_header"')
+    if pos == -1:
+        return None
+    pos = raw.find(b'"msg_id"', pos)
+    if pos == -1:
+        return None
+    start = raw.find(b'"', raw.find(b':', pos) + 1)
+    if start == -1:
+        return None
+    end = raw.find(b'"', start + 1)
+    if end == -1:
+        return None
+    return raw[start + 1:end].decode()
+
+
+class _IOThread:
+    """
+    Singleton asyncio loop running in one daemon thread.
+
+    Pooled sessions multiplex their websockets here instead of spawning a
+    blocking listener thread each: past a handful of sessions, N threads
+    parked in ws.recv() spend more time fighting for the GIL than reading,
+    while a single loop scales to many sockets. Requires the ``websockets``
+    package (the ``async`` extra).
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="kernel-io", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @classmethod
+    def instance(cls) -> "_IOThread":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def submit(self, coro):
+        """Schedule a coroutine on the IO loop; returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
 
 class GatewayKernelSession:
     """
@@ -23,6 +114,22 @@ class GatewayKernelSession:
       - Basic in-memory metrics
       - Clean teardown
     """
+
+    # Immutable execute_request skeleton; each session deep-copies it once
+    # and mutates only msg_id and code per call
+    _PAYLOAD_SKEL = {
+        'header': {
+            'msg_id': None,
+            'session': None,
+            'msg_type': 'execute_request',
+            'version': '5.0',
+        },
+        'parent_header': {},
+        'metadata': {},
+        'channel': 'shell',
+        'content': {'code': None, 'silent': False},
+    }
+
     def __init__(
         self,
         gateway_http: str,
@@ -32,6 +139,7 @@ class GatewayKernelSession:
         startup_timeout: float = 30.0,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        shared_io: bool = False,
     ):
         self.gateway_http = gateway_http.rstrip('/')
         self.gateway_ws = gateway_ws.rstrip('/')
@@ -45,18 +153,37 @@ class GatewayKernelSession:
         self.session_id = uuid.uuid4().hex
         self.ws = None
 
-        # metrics
+        # per-session payload template (execute is serialized per session)
+        self._payload_skel = copy.deepcopy(self._PAYLOAD_SKEL)
+        self._payload_skel['header']['session'] = self.session_id
+
+        # metrics: bounded ring buffers for recent samples plus running
+        # aggregates, so a long-lived session stays O(1) per execute
         self.metrics = {
-            'startup_times': [],
-            'execute_times': [],
+            'startup_times': deque(maxlen=1024),
+            'execute_times': deque(maxlen=1024),
             'executions': 0,
+            'execute_time_sum': 0.0,
+            'execute_time_sumsq': 0.0,
         }
 
-        # internal queue and listener
-        self._msg_queue = queue.Queue()
+        # per-execute response queues: the listener demuxes messages by
+        # parent msg_id so each execute() only sees its own traffic (a
+        # deque + Event per entry is much cheaper than queue.Queue)
+        self._pending: Dict[str, tuple] = {}
         self._listener = None
         self._running = False
-        logging.basicConfig(level=logging.INFO)
+
+        # shared_io multiplexes this session's websocket on the process-wide
+        # _IOThread loop instead of a dedicated listener thread; pools
+        # enable it so N sessions don't mean N recv() threads
+        self._shared_io = shared_io
+        self._io: Optional[_IOThread] = None
+        self._io_recv_task = None
+
+        # opt-in result cache for deterministic snippets, keyed by code hash
+        self._result_cache: OrderedDict[bytes, str] = OrderedDict()
+        self._result_cache_maxsize = 256
 
     def __enter__(self):
         self._start_kernel_with_retries()
@@ -69,24 +196,24 @@ class GatewayKernelSession:
 
     def _start_kernel_with_retries(self):
         for attempt in range(1, self.max_retries + 1):
-            start = time.time()
+            start = time.perf_counter()
             try:
                 payload = {"name": self.kname}
                 if self.launch_env:
                     payload['env'] = self.launch_env
-                resp = requests.post(
+                resp = _HTTP.post(
                     f"{self.gateway_http}/api/kernels",
                     json=payload,
                     timeout=self.startup_timeout,
                 )
                 resp.raise_for_status()
                 self.kernel_id = resp.json()['id']
-                duration = time.time() - start
+                duration = time.perf_counter() - start
                 self.metrics['startup_times'].append(duration)
-                logging.info(f"Kernel started in {duration:.2f}s (attempt {attempt})")
+                logger.info("Kernel started in %.2fs (attempt %d)", duration, attempt)
                 return
             except Exception as e:
-                logging.warning(f"Startup attempt {attempt} failed: {e}")
+                logger.warning("Startup attempt %d failed: %s", attempt, e)
                 if attempt < self.max_retries:
                     time.sleep(self.retry_delay)
                 else:
@@ -97,83 +224,214 @@ class GatewayKernelSession:
             f"{self.gateway_ws}/api/kernels/{self.kernel_id}/channels"
             f"?session_id={self.session_id}"
         )
-        self.ws = create_connection(url)
-        logging.info(f"WebSocket connected to {url}")
+        if self._shared_io:
+            try:
+                # optional: pip install jupyter-kernel-client[async]
+                import websockets
+            except ImportError:
+                # fall back to the listener-thread path rather than fail
+                # here, after the kernel has already been started via REST
+                logger.warning(
+                    "shared_io requested but websockets is not installed; "
+                    "falling back to a dedicated listener thread"
+                )
+                self._shared_io = False
+            else:
+                # async connection driven by the shared IO loop thread;
+                # run_coroutine_threadsafe needs a real coroutine, and
+                # websockets.connect(...) only returns an awaitable
+                async def _connect():
+                    return await websockets.connect(
+                        url, max_size=None, compression=None
+                    )
+
+                self._io = _IOThread.instance()
+                self.ws = self._io.submit(_connect()).result(self.startup_timeout)
+                logger.info("WebSocket connected to %s (shared IO loop)", url)
+                return
+        # Incoming frames are parsed by orjson/json anyway, so the extra
+        # UTF-8 validation pass in websocket-client is redundant work.
+        # enable_multithread locks the send path since the listener thread
+        # and callers share the socket; permessage-deflate stays off
+        # (websocket-client's default) — zlib setup per small JSON frame
+        # costs more CPU than the bytes it saves.
+        self.ws = create_connection(
+            url, skip_utf8_validation=True, enable_multithread=True
+        )
+        # Kernel messages are many small frames; disable Nagle so they go
+        # out immediately instead of waiting on delayed ACKs
+        if self.ws.sock is not None:
+            self.ws.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        logger.info("WebSocket connected to %s", url)
+
+    async def _io_recv_loop(self):
+        """Recv loop run on the shared IO loop; routes frames like _listen."""
+        try:
+            while self._running:
+                raw = await self.ws.recv()
+                if _scan_parent_msg_id(raw) not in self._pending:
+                    continue
+                msg = _loads(raw)
+                parent_id = msg.get('parent_header', {}).get('msg_id')
+                entry = self._pending.get(parent_id)
+                if entry is None:
+                    continue
+                msgs, event = entry
+                msgs.append(msg)
+                event.set()  # threading.Event is safe to set from the loop
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # connection closed; execute() surfaces via timeout/send
 
     def _start_listener(self):
+        if self._shared_io:
+            self._running = True
+            self._io_recv_task = self._io.submit(self._io_recv_loop())
+            return
+
         def _listen():
             while self._running:
                 try:
-                    msg = json.loads(self.ws.recv())
-                    self._msg_queue.put(msg)
+                    raw = self.ws.recv()
+                    # Most IOPub traffic (status, execute_input, other
+                    # parents) isn't for any pending execute; skip the
+                    # full decode for those frames
+                    if _scan_parent_msg_id(raw) not in self._pending:
+                        continue
+                    msg = _loads(raw)
+                    parent_id = msg.get('parent_header', {}).get('msg_id')
+                    entry = self._pending.get(parent_id)
+                    if entry is None:
+                        continue  # no execute waiting on this msg_id
+                    msgs, event = entry
+                    msgs.append(msg)
+                    event.set()
                 except WebSocketException:
                     break
         self._running = True
         self._listener = threading.Thread(target=_listen, daemon=True)
         self._listener.start()
 
-    def execute(self, code: str, timeout: float = 10.0) -> str:
+    def _send_frame(self, frame):
+        if self._io is not None:
+            # decode to str: websockets sends bytes as BINARY frames, which
+            # the gateway's channels handler drops; Jupyter messages must
+            # go out as TEXT frames (websocket-client already does this)
+            if isinstance(frame, bytes):
+                frame = frame.decode()
+            try:
+                self._io.submit(self.ws.send(frame)).result()
+            except Exception as e:
+                # normalize so the retry loop in execute() handles both modes
+                raise WebSocketException(str(e)) from e
+        else:
+            self.ws.send(frame)
+
+    def execute(self, code: str, timeout: float = 10.0, cache: bool = False) -> str:
+        """
+        Execute code in the kernel.
+
+        With cache=True, results are memoized by SHA-256 of the code and a
+        repeat execution skips the kernel round trip entirely. Only enable
+        this for deterministic, side-effect-free snippets.
+        """
         if not self.ws:
             raise RuntimeError("WebSocket not open")
-        start = time.time()
+        if cache:
+            key = hashlib.sha256(code.encode()).digest()
+            if key in self._result_cache:
+                self._result_cache.move_to_end(key)
+                return self._result_cache[key]
+        start = time.perf_counter()
         self.metrics['executions'] += 1
         msg_id = uuid.uuid4().hex
-        header = {
-            'msg_id': msg_id,
-            'session': self.session_id,
-            'msg_type': 'execute_request',
-            'version': '5.0',
-        }
-        payload = {
-            'header': header,
-            'parent_header': {},
-            'metadata': {},
-            'channel': 'shell',
-            'content': {'code': code, 'silent': False},
-        }
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                self.ws.send(json.dumps(payload))
-                break
-            except WebSocketException as e:
-                logging.warning(f"Send attempt {attempt} failed: {e}")
-                if attempt < self.max_retries:
-                    time.sleep(self.retry_delay)
-                else:
-                    raise
+        self._payload_skel['header']['msg_id'] = msg_id
+        self._payload_skel['content']['code'] = code
+        frame = _dumps(self._payload_skel)
+        # Register our response queue before sending so the listener can
+        # route replies straight to us
+        msgs: deque = deque()
+        event = threading.Event()
+        self._pending[msg_id] = (msgs, event)
+        try:
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    self._send_frame(frame)
+                    break
+                except WebSocketException as e:
+                    logger.warning("Send attempt %d failed: %s", attempt, e)
+                    if attempt < self.max_retries:
+                        time.sleep(self.retry_delay)
+                    else:
+                        raise
 
-        output = []
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            try:
-                msg = self._msg_queue.get(timeout=deadline - time.time())
-            except queue.Empty:
-                break
-            if msg.get('parent_header', {}).get('msg_id') != msg_id:
-                continue
-            mtype = msg['header']['msg_type']
-            if mtype == 'stream':
-                output.append(msg['content']['text'])
-            elif mtype == 'execute_result':
-                output.append(msg['content']['data'].get('text/plain', ''))
-                break
-            elif mtype == 'error':
-                tb = '\n'.join(msg['content']['traceback'])
-                raise RuntimeError(f"Kernel error:\n{tb}")
-        duration = time.time() - start
+            output = []
+            completed = False
+            # monotonic deadline: immune to NTP slews, cheaper than
+            # wall-clock on most platforms
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                while not msgs:
+                    event.clear()
+                    if msgs:
+                        break
+                    if not event.wait(remaining):
+                        break
+                if not msgs:
+                    break
+                msg = msgs.popleft()
+                mtype = msg['header']['msg_type']
+                if mtype == 'stream':
+                    output.append(msg['content']['text'])
+                elif mtype == 'execute_result':
+                    output.append(msg['content']['data'].get('text/plain', ''))
+                    completed = True
+                    break
+                elif mtype == 'error':
+                    tb = '\n'.join(msg['content']['traceback'])
+                    raise RuntimeError(f"Kernel error:\n{tb}")
+        finally:
+            self._pending.pop(msg_id, None)
+        duration = time.perf_counter() - start
         self.metrics['execute_times'].append(duration)
-        logging.info(f"Execution took {duration:.2f}s")
-        return ''.join(output)
+        self.metrics['execute_time_sum'] += duration
+        self.metrics['execute_time_sumsq'] += duration * duration
+        # hot path: skip handler machinery entirely when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Execution took %.2fs", duration)
+        result = ''.join(output)
+        # only memoize runs that actually finished with a result; caching a
+        # timed-out '' would poison every later cache=True call for this code
+        if cache and completed:
+            self._result_cache[key] = result
+            if len(self._result_cache) > self._result_cache_maxsize:
+                self._result_cache.popitem(last=False)
+        return result
+
+    def clear_cache(self):
+        """Drop all memoized execute results."""
+        self._result_cache.clear()
 
     def shutdown(self):
         self._running = False
-        if self.ws:
+        if self._io is not None:
+            if self._io_recv_task is not None:
+                self._io_recv_task.cancel()
+            if self.ws:
+                try:
+                    self._io.submit(self.ws.close()).result(5)
+                except: pass
+        elif self.ws:
             try:
                 self.ws.close()
             except: pass
         if self.kernel_id:
             try:
-                requests.delete(f"{self.gateway_http}/api/kernels/{self.kernel_id}")
+                _HTTP.delete(f"{self.gateway_http}/api/kernels/{self.kernel_id}")
             except: pass
 
 
@@ -181,13 +439,40 @@ class KernelSessionPool:
     """
     A basic pool managing a fixed number of persistent kernel sessions.
     """
-    def __init__(self, size, **session_kwargs):
+    def __init__(self, size, shared_io: bool = False, **session_kwargs):
         self._pool = []
         self._lock = threading.Lock()
-        for _ in range(size):
-            sess = GatewayKernelSession(**session_kwargs)
-            sess.__enter__()
-            self._pool.append(sess)
+        # shared_io=True multiplexes every member's websocket on one IO
+        # loop thread; thread-per-session recv() stops scaling around 4-8
+        # sessions once GIL contention dominates IOPub bursts. Opt-in
+        # because it needs the websockets package (the async extra);
+        # without it each session keeps its dedicated listener thread.
+        session_kwargs.setdefault('shared_io', shared_io)
+        # Kernel startup is network-bound, so bring all members up
+        # concurrently: warm-up takes ~max(startup) instead of the sum
+        sessions = [GatewayKernelSession(**session_kwargs) for _ in range(size)]
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(sess.__enter__) for sess in sessions]
+            started = []
+            failure = None
+            for sess, future in zip(sessions, futures):
+                try:
+                    future.result()
+                    started.append(sess)
+                except Exception as e:
+                    if failure is None:
+                        failure = e
+            if failure is not None:
+                # shut down whatever did come up so a partial warm-up
+                # doesn't leak live kernels on the gateway
+                def _safe_shutdown(sess):
+                    try:
+                        sess.shutdown()
+                    except Exception:
+                        pass
+                list(executor.map(_safe_shutdown, started))
+                raise failure
+        self._pool.extend(sessions)
 
     def acquire(self):
         with self._lock:
@@ -199,6 +484,8 @@ class KernelSessionPool:
 
     def shutdown_all(self):
         with self._lock:
-            for sess in self._pool:
-                sess.shutdown()
-            self._pool.clear() 
\ No newline at end of file
+            sessions = list(self._pool)
+            self._pool.clear()
+        if sessions:
+            with ThreadPoolExecutor(max_workers=len(sessions)) as executor:
+                list(executor.map(lambda sess: sess.shutdown(), sessions)) 
\ No newline at end of file
@@ -1,158 +1,222 @@
-import unittest
 from unittest.mock import patch, MagicMock
 import json
 import pytest
-import requests
-from websocket import WebSocketException
+
+# the client hard-depends on websocket-client; skip the module cleanly
+# instead of erroring at collection when it isn't installed
+pytest.importorskip("websocket")
 
 from jupyter_kernel_client.core.client import GatewayKernelSession
 
-class TestGatewayKernelSessionMock(unittest.TestCase):
-    """Unit tests for GatewayKernelSession using mocks."""
-      def setUp(self):
-        self.gateway_http = "http://localhost:8889"
-        self.gateway_ws = "ws://localhost:8889"
-        self.kernel_name = "python3"
-        self.session = None
-    
-    @patch('jupyter_kernel_client.core.client.requests.post')
-    @patch('jupyter_kernel_client.core.client.create_connection')
-    def test_start_kernel(self, mock_ws, mock_post):
-        """Test kernel startup with mocked responses."""
-        # Configure mocks
+# requests (urllib3, ssl, charset detection...) is only needed by the
+# integration probe; importing it lazily there keeps unit-test collection
+# from paying its import cost
+
+GATEWAY_HTTP = "http://localhost:8889"
+GATEWAY_WS = "ws://localhost:8889"
+KERNEL_NAME = "python3"
+
+# Serialized once at import; tests substitute the msg_id with
+# str.replace instead of re-dumping the dict per message
+_RESP_TEMPLATE = json.dumps({
+    "header": {"msg_type": "execute_result"},
+    "parent_header": {"msg_id": "__MSG_ID__"},
+    "content": {"data": {"text/plain": "Hello World"}}
+})
+
+
+class _FakeAsyncWS:
+    """Minimal async websocket double for the shared-IO path."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, frame):
+        self.sent.append(frame)
+
+    async def close(self):
+        pass
+
+
+# module-level so the class-scoped fixture isn't an instance method,
+# which pytest deprecates (PytestRemovedIn10Warning)
+@pytest.fixture(scope="class")
+def mocked_session():
+    """
+    Patched transport plus one started session, shared by the class:
+    re-wiring the mocks and re-starting a session per test is pure
+    overhead since the tests only assert on behaviour.
+    """
+    patches = [
+        patch('jupyter_kernel_client.core.client._HTTP.post'),
+        patch('jupyter_kernel_client.core.client.create_connection'),
+    ]
+    mock_post, mock_ws = [p.start() for p in patches]
+    try:
         mock_response = MagicMock()
         mock_response.json.return_value = {"id": "test-kernel-id"}
         mock_post.return_value = mock_response
-        
-        # Create session and test kernel start
+        mock_socket = MagicMock()
+        mock_socket.recv.return_value = _RESP_TEMPLATE
+        mock_ws.return_value = mock_socket
+
         session = GatewayKernelSession(
-            self.gateway_http, 
-            self.gateway_ws,
-            self.kernel_name
+            GATEWAY_HTTP,
+            GATEWAY_WS,
+            KERNEL_NAME
         )
         session._start_kernel_with_retries()
-        
-        # Assertions
+        session._connect_ws()
+        yield session, mock_post, mock_ws
+    finally:
+        for p in patches:
+            p.stop()
+
+
+class TestGatewayKernelSessionMock:
+    """Unit tests for GatewayKernelSession using mocks."""
+
+    def test_start_kernel(self, mocked_session):
+        """Test kernel startup with mocked responses."""
+        session, mock_post, _ = mocked_session
         mock_post.assert_called_once()
-        self.assertEqual(session.kernel_id, "test-kernel-id")
-    
-    @patch('jupyter_kernel_client.core.client.requests.post')
+        assert session.kernel_id == "test-kernel-id"
+
+    @patch('jupyter_kernel_client.core.client._HTTP.post')
     @patch('jupyter_kernel_client.core.client.create_connection')
-    @patch('jupyter_kernel_client.core.client.requests.delete')
+    @patch('jupyter_kernel_client.core.client._HTTP.delete')
     def test_context_manager(self, mock_delete, mock_ws, mock_post):
         """Test session lifecycle using context manager."""
-        # Configure mocks
+        # Lifecycle semantics need a dedicated session, not the shared one
         mock_response = MagicMock()
         mock_response.json.return_value = {"id": "test-kernel-id"}
         mock_post.return_value = mock_response
         mock_ws.return_value = MagicMock()
-        
-        # Use context manager
+
         with GatewayKernelSession(
-            self.gateway_http, 
-            self.gateway_ws,
-            self.kernel_name
+            GATEWAY_HTTP,
+            GATEWAY_WS,
+            KERNEL_NAME
         ) as session:
-            self.assertEqual(session.kernel_id, "test-kernel-id")
-            self.assertTrue(session._running)
-        
+            assert session.kernel_id == "test-kernel-id"
+            assert session._running
+
         # Verify shutdown was called
         mock_delete.assert_called_once()
-    
-    @patch('jupyter_kernel_client.core.client.requests.post')
-    @patch('jupyter_kernel_client.core.client.create_connection')
-    def test_execute_success(self, mock_ws, mock_post):
+
+    def test_execute_success(self, mocked_session):
         """Test code execution with successful result."""
-        # Configure mocks
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"id": "test-kernel-id"}
-        mock_post.return_value = mock_response
-        
-        mock_socket = MagicMock()
-        # Configure the websocket to return a valid result message
-        def mock_recv():
-            return json.dumps({
-                "header": {"msg_type": "execute_result"},
-                "parent_header": {"msg_id": "any-id"},  # Will be replaced in the test
-                "content": {"data": {"text/plain": "Hello World"}}
-            })
-        mock_socket.recv = mock_recv
-        mock_ws.return_value = mock_socket
-        
-        # Create session and override the queue behavior
-        session = GatewayKernelSession(
-            self.gateway_http, 
-            self.gateway_ws,
-            self.kernel_name
-        )
-        session._start_kernel_with_retries()
-        session._connect_ws()
-        
-        # Patch the queue to insert our mock message
+        session, _, _ = mocked_session
+
+        # Route a mock result straight into the pending-execute queue,
+        # stamping the msg_id into the pre-serialized template
         def put_mock_msg(msg_id):
-            session._msg_queue.put({
-                "header": {"msg_type": "execute_result"},
-                "parent_header": {"msg_id": msg_id},
-                "content": {"data": {"text/plain": "Hello World"}}
-            })
-        
+            msgs, event = session._pending[msg_id]
+            msgs.append(json.loads(_RESP_TEMPLATE.replace("__MSG_ID__", msg_id)))
+            event.set()
+
         with patch.object(session.ws, 'send', side_effect=lambda msg: put_mock_msg(json.loads(msg)["header"]["msg_id"])):
             result = session.execute("print('Hello World')", timeout=1)
-            self.assertEqual(result, "Hello World")
+            assert result == "Hello World"
+
+    def test_shared_io_connect_and_send(self):
+        """shared_io connects via the IO loop thread and sends TEXT frames."""
+        websockets = pytest.importorskip("websockets")
+        fake_ws = _FakeAsyncWS()
+
+        def fake_connect(url, **kwargs):
+            async def _open():
+                return fake_ws
+            return _open()
+
+        session = GatewayKernelSession(
+            GATEWAY_HTTP, GATEWAY_WS, KERNEL_NAME, shared_io=True
+        )
+        session.kernel_id = "test-kernel-id"
+        with patch.object(websockets, 'connect', fake_connect):
+            session._connect_ws()
+        try:
+            assert session.ws is fake_ws
+            assert session._io is not None
+            session._send_frame(b'{"ping": 1}')
+            # bytes must leave as TEXT frames (str) on the websockets path
+            assert fake_ws.sent == ['{"ping": 1}']
+            assert isinstance(fake_ws.sent[0], str)
+        finally:
+            session.kernel_id = None  # skip the REST delete in shutdown
+            session.shutdown()
+
+
+# probe result shared by every integration test; one HTTP round-trip
+# (or one 2s timeout) per run instead of one per test
+_GATEWAY_PROBE = {}
+
+
+@pytest.fixture(scope="module")
+def gateway_config():
+    """Fixture for gateway connection details."""
+    return {
+        "http": "http://localhost:8889",
+        "ws": "ws://localhost:8889",
+        "kernel_name": "python3"
+    }
+
+
+@pytest.fixture(scope="class")
+def check_gateway_available(gateway_config):
+    """Skip tests if gateway is not available (probed once per run)."""
+    import requests
+    url = gateway_config['http']
+    available = _GATEWAY_PROBE.get(url)
+    if available is None:
+        try:
+            requests.get(f"{url}/api", timeout=2)
+            available = True
+        except requests.exceptions.RequestException:
+            available = False
+        _GATEWAY_PROBE[url] = available
+    if not available:
+        pytest.skip("Enterprise Gateway not available")
+
+
+@pytest.fixture(scope="class")
+def live_session(gateway_config, check_gateway_available):
+    """One started kernel shared by the class: each context-managed
+    session otherwise costs a full kernel boot and shutdown."""
+    with GatewayKernelSession(
+        gateway_config["http"],
+        gateway_config["ws"],
+        gateway_config["kernel_name"]
+    ) as session:
+        yield session
 
 
 @pytest.mark.integration
 class TestGatewayKernelSessionIntegration:
     """Integration tests that connect to a real Enterprise Gateway."""
-      @pytest.fixture(scope="module")
-    def gateway_config(self):
-        """Fixture for gateway connection details."""
-        return {
-            "http": "http://localhost:8889",
-            "ws": "ws://localhost:8889",
-            "kernel_name": "python3"
-        }
-    
-    @pytest.fixture(autouse=True)
-    def check_gateway_available(self, gateway_config):
-        """Skip tests if gateway is not available."""
-        try:
-            requests.get(f"{gateway_config['http']}/api", timeout=2)
-        except requests.exceptions.RequestException:
-            pytest.skip("Enterprise Gateway not available")
-    
-    def test_kernel_lifecycle(self, gateway_config):
-        """Test full kernel lifecycle: start, execute, shutdown."""
-        with GatewayKernelSession(
-            gateway_config["http"],
-            gateway_config["ws"],
-            gateway_config["kernel_name"]
-        ) as session:
-            assert session.kernel_id is not None
-            
-            # Simple code execution
-            result = session.execute("2 + 2")
-            assert "4" in result
-            
-            # Test environment variables
-            result = session.execute("import os; os.environ.get('FILE_SERVER_URL')")
-            assert "file-server" in result.lower() or "8080" in result
-    
-    def test_error_handling(self, gateway_config):
+
+    def test_kernel_lifecycle(self, live_session):
+        """Test kernel startup and code execution."""
+        assert live_session.kernel_id is not None
+
+        # Simple code execution
+        result = live_session.execute("2 + 2")
+        assert "4" in result
+
+        # Test environment variables
+        result = live_session.execute("import os; os.environ.get('FILE_SERVER_URL')")
+        assert "file-server" in result.lower() or "8080" in result
+
+    def test_error_handling(self, live_session):
         """Test error handling in code execution."""
-        with GatewayKernelSession(
-            gateway_config["http"],
-            gateway_config["ws"],
-            gateway_config["kernel_name"]
-        ) as session:
-            with pytest.raises(RuntimeError) as excinfo:
-                session.execute("raise ValueError('Test error')")
-            assert "ValueError" in str(excinfo.value)
+        with pytest.raises(RuntimeError) as excinfo:
+            live_session.execute("raise ValueError('Test error')")
+        assert "ValueError" in str(excinfo.value)
 
 
 if __name__ == "__main__":
     # Run unit tests
-    unittest.main(argv=['first-arg-is-ignored'], exit=False)
-    
+    pytest.main([__file__, '-m', 'not integration'])
+
     # To run integration tests:
     # pytest -xvs src/jupyter_kernel_client/core/test_client.py::TestGatewayKernelSessionIntegration 
\ No newline at end of file
@@ -1,26 +1,50 @@
 """
 Prometheus metrics integration for the Jupyter Kernel Client.
 """
+import os
 import time
 import logging
+import threading
 from typing import Dict, Any, Optional
 
-from prometheus_client import Counter, Histogram, Gauge
+from prometheus_client import Counter, Histogram, Gauge, Summary, REGISTRY
 from jupyter_kernel_client.core.client import GatewayKernelSession, KernelSessionPool
 
-# Setup Prometheus metrics
+# Setup Prometheus metrics.
+# The kernel_type label must stay low-cardinality (a handful of kernel
+# names); every label value multiplies the series emitted per scrape.
+# Explicit coarse buckets replace prometheus_client's ~15 defaults: kernel
+# startup is seconds-to-minutes and executions sub-second-to-tens, so nine
+# workload-matched buckets cut the _bucket series per label by ~40%
+# without losing useful resolution.
 KERNEL_STARTUP_TIME = Histogram(
-    'kernel_startup_time_seconds', 
+    'kernel_startup_time_seconds',
     'Time taken to start a kernel',
-    ['kernel_type']
+    ['kernel_type'],
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, float("inf"))
 )
 
 KERNEL_EXECUTION_TIME = Histogram(
-    'kernel_execution_time_seconds', 
+    'kernel_execution_time_seconds',
     'Time taken to execute code in a kernel',
+    ['kernel_type'],
+    buckets=(0.05, 0.1, 0.5, 1, 2, 5, 10, 30, float("inf"))
+)
+
+# Primary latency metric: two series (count + sum) per kernel_type versus
+# eleven for the histogram. Deployments that need full latency
+# distributions for aggregation can opt back into the histogram with
+# JKC_METRICS_EMIT_HISTOGRAM=1; the summary is always emitted.
+KERNEL_EXECUTION_TIME_SUMMARY = Summary(
+    'kernel_execution_time_seconds_summary',
+    'Time taken to execute code in a kernel (count and sum)',
     ['kernel_type']
 )
 
+_EMIT_HISTOGRAM = os.getenv(
+    'JKC_METRICS_EMIT_HISTOGRAM', '0'
+).lower() in ('1', 'true', 'yes')
+
 KERNEL_EXECUTION_COUNT = Counter(
     'kernel_execution_total', 
     'Total number of code executions',
@@ -51,47 +75,89 @@ class MetricsCollector:
     
     def __init__(self, kernel_type: str = "python3"):
         self.kernel_type = kernel_type
-        
+        # Resolve labelled children once: every .labels() call takes a
+        # dict lookup plus a lock inside prometheus_client, and several of
+        # these sit on the execute() hot path
+        self._startup_h = KERNEL_STARTUP_TIME.labels(kernel_type=kernel_type)
+        self._exec_s = KERNEL_EXECUTION_TIME_SUMMARY.labels(kernel_type=kernel_type)
+        self._exec_h = (
+            KERNEL_EXECUTION_TIME.labels(kernel_type=kernel_type)
+            if _EMIT_HISTOGRAM else None
+        )
+        self._active = KERNEL_ACTIVE.labels(kernel_type=kernel_type)
+        self._pool_g = KERNEL_POOL_SIZE.labels(kernel_type=kernel_type)
+        # status/operation counter children are created lazily on first
+        # increment: instantiating e.g. the error child up front would
+        # export a permanently-zero series for every kernel_type that
+        # never fails
+        self._exec_count_children: Dict[str, Any] = {}
+        self._retry_children: Dict[str, Any] = {}
+
     def record_startup_time(self, duration: float):
         """Record kernel startup time."""
-        KERNEL_STARTUP_TIME.labels(kernel_type=self.kernel_type).observe(duration)
-        
+        self._startup_h.observe(duration)
+
     def record_execution_time(self, duration: float):
         """Record code execution time."""
-        KERNEL_EXECUTION_TIME.labels(kernel_type=self.kernel_type).observe(duration)
-        
+        self._exec_s.observe(duration)
+        if self._exec_h is not None:
+            self._exec_h.observe(duration)
+
     def increment_execution_count(self, status: str = "success"):
         """Increment the execution counter."""
-        KERNEL_EXECUTION_COUNT.labels(kernel_type=self.kernel_type, status=status).inc()
-        
+        child = self._exec_count_children.get(status)
+        if child is None:
+            child = KERNEL_EXECUTION_COUNT.labels(
+                kernel_type=self.kernel_type, status=status
+            )
+            self._exec_count_children[status] = child
+        child.inc()
+
     def set_active_kernels(self, count: int):
         """Set the number of active kernels."""
-        KERNEL_ACTIVE.labels(kernel_type=self.kernel_type).set(count)
-        
+        self._active.set(count)
+
     def set_pool_size(self, size: int):
         """Set the current pool size."""
-        KERNEL_POOL_SIZE.labels(kernel_type=self.kernel_type).set(size)
-        
+        self._pool_g.set(size)
+
     def increment_retry_count(self, operation: str):
         """Increment the retry counter for a specific operation."""
-        KERNEL_RETRY_COUNT.labels(kernel_type=self.kernel_type, operation=operation).inc()
-        
+        child = self._retry_children.get(operation)
+        if child is None:
+            child = KERNEL_RETRY_COUNT.labels(
+                kernel_type=self.kernel_type, operation=operation
+            )
+            self._retry_children[operation] = child
+        child.inc()
+
     def export_metrics(self) -> Dict[str, Any]:
         """Export metrics in a dictionary format."""
+        # One pass over the registry's public collect() API instead of
+        # reaching into _sum/_value, which are private and shift between
+        # prometheus_client versions; lazily-created children that never
+        # fired simply have no sample and default to 0
+        samples = {}
+        for metric in REGISTRY.collect():
+            for sample in metric.samples:
+                if sample.labels.get('kernel_type') != self.kernel_type:
+                    continue
+                sub = sample.labels.get('status') or sample.labels.get('operation')
+                samples[(sample.name, sub)] = sample.value
         return {
             "kernel_type": self.kernel_type,
             "metrics": {
-                "startup_times": KERNEL_STARTUP_TIME.labels(kernel_type=self.kernel_type)._sum.get(),
-                "execution_times": KERNEL_EXECUTION_TIME.labels(kernel_type=self.kernel_type)._sum.get(),
+                "startup_times": samples.get(('kernel_startup_time_seconds_sum', None), 0.0),
+                "execution_times": samples.get(('kernel_execution_time_seconds_summary_sum', None), 0.0),
                 "executions": {
-                    "success": KERNEL_EXECUTION_COUNT.labels(kernel_type=self.kernel_type, status="success")._value.get(),
-                    "error": KERNEL_EXECUTION_COUNT.labels(kernel_type=self.kernel_type, status="error")._value.get(),
+                    "success": samples.get(('kernel_execution_total', 'success'), 0.0),
+                    "error": samples.get(('kernel_execution_total', 'error'), 0.0),
                 },
-                "active_kernels": KERNEL_ACTIVE.labels(kernel_type=self.kernel_type)._value,
-                "pool_size": KERNEL_POOL_SIZE.labels(kernel_type=self.kernel_type)._value,
+                "active_kernels": samples.get(('kernel_active', None), 0.0),
+                "pool_size": samples.get(('kernel_pool_size', None), 0.0),
                 "retries": {
-                    "startup": KERNEL_RETRY_COUNT.labels(kernel_type=self.kernel_type, operation="startup")._value.get(),
-                    "execute": KERNEL_RETRY_COUNT.labels(kernel_type=self.kernel_type, operation="execute")._value.get(),
+                    "startup": samples.get(('kernel_retry_total', 'startup'), 0.0),
+                    "execute": samples.get(('kernel_retry_total', 'execute'), 0.0),
                 }
             }
         }
@@ -110,10 +176,12 @@ class PrometheusKernelSessionMixin:
         
     def _start_kernel_with_retries(self):
         """Override to add metrics for kernel startup."""
-        start = time.time()
+        # perf_counter: monotonic and vDSO-backed, so latency samples are
+        # cheap and immune to wall-clock adjustments
+        start = time.perf_counter()
         try:
             super()._start_kernel_with_retries()
-            duration = time.time() - start
+            duration = time.perf_counter() - start
             self.metrics_collector.record_startup_time(duration)
             self.metrics_collector.set_active_kernels(1)
             return True
@@ -121,18 +189,19 @@ class PrometheusKernelSessionMixin:
             self.metrics_collector.increment_retry_count("startup")
             raise
             
-    def execute(self, code, timeout=10):
+    def execute(self, code, timeout=10, **kwargs):
         """Override to add metrics for code execution."""
-        start = time.time()
+        start = time.perf_counter()
         try:
-            result = super().execute(code, timeout)
-            duration = time.time() - start
+            result = super().execute(code, timeout, **kwargs)
+            duration = time.perf_counter() - start
             self.metrics_collector.record_execution_time(duration)
             self.metrics_collector.increment_execution_count("success")
             return result
         except Exception as e:
+            # a failed execute is not a retry; kernel_retry_total only
+            # counts attempts made by an actual retry loop
             self.metrics_collector.increment_execution_count("error")
-            self.metrics_collector.increment_retry_count("execute")
             raise
             
     def shutdown(self):
@@ -147,22 +216,65 @@ class PrometheusKernelPoolMixin:
     Add this to your KernelSessionPool class to enable metrics collection.
     """
     
+    # Prometheus scrapes every 10-60s, so gauges don't need to be updated
+    # on every acquire/release; a periodic flush avoids taking the client
+    # library's lock on the pool's hot path.
+    GAUGE_FLUSH_INTERVAL = 0.1
+
     def __init__(self, size, **session_kwargs):
         self.metrics_collector = MetricsCollector(session_kwargs.get('kernel_name', 'python3'))
+        # Plain ints mutated on acquire/release; flushed to gauges by the
+        # background updater
+        self._free_count = size
+        self._total_size = size
         # Call the parent class's __init__
         super().__init__(size, **session_kwargs)
         self.metrics_collector.set_pool_size(size)
-        
+        self._gauge_stop = threading.Event()
+        self._gauge_flusher = threading.Thread(target=self._flush_gauges, daemon=True)
+        self._gauge_flusher.start()
+
+    def _flush_gauges(self):
+        """Periodically push the counters into the Prometheus gauges."""
+        while not self._gauge_stop.wait(self.GAUGE_FLUSH_INTERVAL):
+            self.metrics_collector.set_pool_size(self._free_count)
+            self.metrics_collector.set_active_kernels(self._total_size - self._free_count)
+
     def acquire(self):
         """Override to update pool size metric."""
         session = super().acquire()
-        self.metrics_collector.set_pool_size(len(self._pool))
+        self._free_count = len(self._pool)
         return session
-        
+
     def release(self, sess):
         """Override to update pool size metric."""
         super().release(sess)
-        self.metrics_collector.set_pool_size(len(self._pool))
+        self._free_count = len(self._pool)
+
+    def shutdown_all(self):
+        """Override to stop the gauge updater and record the final state."""
+        super().shutdown_all()
+        self._gauge_stop.set()
+        self._gauge_flusher.join()
+        self._free_count = 0
+        self._total_size = 0
+        self.metrics_collector.set_pool_size(0)
+        self.metrics_collector.set_active_kernels(0)
+
+
+# Started-once guard for the scrape endpoint: start_http_server binds a
+# socket and spawns a thread, so calling it again (re-imports, notebooks,
+# test runs) either fails on the bind or leaks threads
+_metrics_server = None
+
+
+def start_metrics_server(port: int = 8000):
+    """Start the Prometheus scrape endpoint once; later calls are no-ops."""
+    global _metrics_server
+    if _metrics_server is None:
+        from prometheus_client import start_http_server
+        _metrics_server = start_http_server(port) or True
+    return _metrics_server
 
 
 class PrometheusGatewayKernelSession(PrometheusKernelSessionMixin, GatewayKernelSession):
@@ -178,10 +290,8 @@ class PrometheusKernelSessionPool(PrometheusKernelPoolMixin, KernelSessionPool):
 # Usage example
 def example_usage():
     """Simple example of using the metrics-enhanced client."""
-    from prometheus_client import start_http_server
-    
-    # Start Prometheus HTTP server
-    start_http_server(8000)
+    # Start Prometheus HTTP server (idempotent)
+    start_metrics_server(8000)
     print("Prometheus metrics server started at http://localhost:8000")
       # Create a session with metrics
     session = PrometheusGatewayKernelSession(
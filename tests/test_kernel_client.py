@@ -4,14 +4,27 @@ This file runs tests for all modules.
 """
 import unittest
 import pytest
-import sys
-import os
 
-# Add src directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+# Under pytest, src/ is already on sys.path via tests/conftest.py; the
+# fallback below only fires for direct `python tests/test_kernel_client.py`
+# invocation, so the pytest path keeps a single sys.path entry
+try:
+    import jupyter_kernel_client  # noqa: F401
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-# Import tests
-from jupyter_kernel_client.core.test_client import TestGatewayKernelSessionMock, TestGatewayKernelSessionIntegration
+# Import tests (the module-level fixtures come along so the re-collected
+# classes can resolve them here too)
+from jupyter_kernel_client.core.test_client import (
+    TestGatewayKernelSessionMock,
+    TestGatewayKernelSessionIntegration,
+    mocked_session,
+    gateway_config,
+    check_gateway_available,
+    live_session,
+)
 
 
 class TestPackageImports(unittest.TestCase):
@@ -26,12 +39,12 @@ class TestPackageImports(unittest.TestCase):
 
 def run_unit_tests():
     """Run all unit tests."""
-    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+    return pytest.main([__file__, '-m', 'not integration'])
 
 
 def run_integration_tests():
     """Run integration tests."""
-    pytest.main(['-xvs', 'tests/test_kernel_client.py::run_integration_tests'])
+    return pytest.main(['-xvs', __file__, '-m', 'integration'])
 
 
 def integration_test_suite():